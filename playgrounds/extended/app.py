@@ -3,11 +3,21 @@ Refactored Flask application using SOLID principles and modular architecture.
 """
 import os
 import asyncio
+import functools
+import json
 import uuid
-import glob
+import threading
 import time
-from flask import Flask, render_template, request, jsonify, session
+from typing import Dict
+from flask import Flask, abort, g, render_template, request, jsonify, session
 from dotenv import load_dotenv
+from flask.json.provider import DefaultJSONProvider
+
+# Optional: pip install orjson
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from core.settings import FileSettingsRepository, SettingsManager
 from core.chat_service import ChatService, ChatSessionManager
@@ -21,6 +31,18 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key-change-in-production")
 
+if orjson is not None:
+    class _OrjsonProvider(DefaultJSONProvider):
+        """JSON provider backed by orjson so every jsonify() goes fast."""
+
+        def dumps(self, obj, **kwargs) -> str:
+            return orjson.dumps(obj, default=self.default).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrjsonProvider(app)
+
 # Initialize core services
 settings_repository = FileSettingsRepository(
     os.getenv("PLAYGROUND_SETTINGS_PATH", "../session-data/settings.json")
@@ -31,53 +53,125 @@ chat_session_manager = ChatSessionManager()
 # Get default chat service
 default_chat_service = ChatService(settings_manager)
 
+# One long-lived event loop on a daemon thread instead of asyncio.run per
+# request, so MCP transport state survives across requests.
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="async-loop", daemon=True).start()
+
+
+def run_async(coro, timeout=300):
+    """Run a coroutine on the persistent background loop and wait for it."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result(timeout)
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def read_json(req) -> dict:
+    """Parse a JSON request body straight from the raw bytes.
+
+    Skips Werkzeug's Content-Type handling and, with cache=False, avoids
+    buffering the body a second time.
+    """
+    raw = req.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        data = _json_loads(raw)
+    except Exception:
+        abort(400, description="Request body is not valid JSON")
+    return data if isinstance(data, dict) else {}
+
 
 def cleanup_old_session_files(max_age_hours=24):
     """Clean up old session settings files."""
     try:
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 3600
-        
-        # Find all session settings files in session-data folder
-        session_files = glob.glob("../session-data/settings-*.json")
-        
-        for file_path in session_files:
-            file_age = current_time - os.path.getmtime(file_path)
-            if file_age > max_age_seconds:
-                os.remove(file_path)
-                print(f"Cleaned up old session file: {file_path}")
+        cutoff = time.time() - max_age_hours * 3600
+
+        # Scan the session-data folder once; DirEntry caches the stat result
+        with os.scandir("../session-data") as entries:
+            for entry in entries:
+                if not (entry.name.startswith("settings-") and entry.name.endswith(".json")):
+                    continue
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    print(f"Cleaned up old session file: {entry.path}")
+    except FileNotFoundError:
+        pass  # session-data directory not created yet
     except Exception as e:
         print(f"Error cleaning up session files: {e}")
 
 
+def _session_cleanup_loop(interval_seconds=3600):
+    """Periodically clean up old session files off the request path."""
+    while True:
+        time.sleep(interval_seconds)
+        cleanup_old_session_files()
+
+
+threading.Thread(target=_session_cleanup_loop, daemon=True).start()
+
+
+@app.before_request
+def _init_session_context():
+    """Resolve the session ID and settings path once per request."""
+    session_id = session.get('session_id')
+    if not session_id:
+        session_id = str(uuid.uuid4())
+        session['session_id'] = session_id
+        print(f"Created new session: {session_id}")
+    g.session_id = session_id
+    g.session_settings_path = f"../session-data/settings-{session_id}.json"
+    g.logger = logging_service.get_logger(session_id)
+
+
 def get_session_settings_repository():
     """Get or create session-specific settings repository."""
-    if 'session_id' not in session:
-        session['session_id'] = str(uuid.uuid4())
-        print(f"Created new session: {session['session_id']}")
-    
-    session_id = session['session_id']
-    session_settings_path = f"../session-data/settings-{session_id}.json"
-    
-    return FileSettingsRepository(session_settings_path)
+    return FileSettingsRepository(g.session_settings_path)
+
+
+# Cache of per-session SettingsManager instances so hot endpoints don't
+# re-read settings-{session_id}.json from disk on every call. Entries are
+# (manager, mtime of the settings file when the manager was cached).
+_session_manager_cache: Dict[str, tuple] = {}
+_session_manager_lock = threading.Lock()
+
+
+def _settings_file_mtime(path: str) -> float:
+    """Get the mtime of a settings file, or -1.0 if it doesn't exist yet."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return -1.0
 
 
 def get_session_settings_manager():
-    """Get session-specific settings manager."""
+    """Get session-specific settings manager, reusing a cached instance."""
     session_repo = get_session_settings_repository()
-    return SettingsManager(session_repo)
+    session_id = g.session_id
+    mtime = _settings_file_mtime(session_repo.file_path)
+
+    with _session_manager_lock:
+        cached = _session_manager_cache.get(session_id)
+        if cached is not None and mtime <= cached[1]:
+            return cached[0]
+
+        manager = SettingsManager(session_repo)
+        _session_manager_cache[session_id] = (manager, mtime)
+        return manager
+
+
+def _refresh_session_manager_cache(session_id: str, manager: SettingsManager) -> None:
+    """Re-stamp the cached manager after it has written the settings file."""
+    mtime = _settings_file_mtime(manager.repository.file_path)
+    with _session_manager_lock:
+        _session_manager_cache[session_id] = (manager, mtime)
 
 
 @app.route("/")
 def index():
     """Render the main application page."""
-    # Clean up old session files on each request (optional)
-    cleanup_old_session_files()
-    
-    # Get or create session logger
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    session['session_id'] = session_id
-    logger = logging_service.get_logger(session_id)
+    logger = g.logger
     logger.log_info("Application started - main page loaded")
     
     return render_template("index.html")
@@ -95,9 +189,7 @@ def api_get_settings():
     session_settings_manager = get_session_settings_manager()
     settings = session_settings_manager.get_settings()
     
-    # Get session logger
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    logger = logging_service.get_logger(session_id)
+    logger = g.logger
     
     # Debug logging
     logger.log_info("Settings API called")
@@ -118,28 +210,29 @@ def api_get_settings():
 @app.post("/api/settings")
 def api_set_settings():
     """Update application settings."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     session_settings_manager = get_session_settings_manager()
     updated_settings = session_settings_manager.update_settings(data)
-    
+    _refresh_session_manager_cache(g.session_id, session_settings_manager)
+
     return jsonify({"ok": True})
 
 
 @app.post("/api/optimize")
 def api_optimize():
     """Optimize a user prompt using MCP context."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     user_prompt = (data.get("user_prompt") or "").strip()
     provider = (data.get("provider") or "anthropic").strip()
     
-    # Get session logger
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    logger = logging_service.get_logger(session_id)
+    logger = g.logger
     
-    logger.log_api_call("/api/optimize", "POST", {"user_prompt": user_prompt[:200], "provider": provider})
+    logger.log_api_call("/api/optimize", "POST",
+                        {"user_prompt": user_prompt[:200], "provider": provider}
+                        if logger.debug_enabled else None)
     
     try:
-        result = asyncio.run(default_chat_service.optimize_prompt(user_prompt, provider, logger))
+        result = run_async(default_chat_service.optimize_prompt(user_prompt, provider, logger))
         
         # Get usage information for the optimization
         session_settings_manager = get_session_settings_manager()
@@ -162,19 +255,19 @@ def api_optimize():
 @app.post("/api/chat")
 def api_chat():
     """Send a chat message and get a response."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     provider = data.get("provider", "anthropic")
     model = data.get("model")
     user_prompt = (data.get("user_prompt") or "").strip()
     
-    # Get session logger
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    logger = logging_service.get_logger(session_id)
+    logger = g.logger
     
-    logger.log_api_call("/api/chat", "POST", {"user_prompt": user_prompt[:200], "provider": provider, "model": model})
+    logger.log_api_call("/api/chat", "POST",
+                        {"user_prompt": user_prompt[:200], "provider": provider, "model": model}
+                        if logger.debug_enabled else None)
     
     try:
-        response = asyncio.run(default_chat_service.send_message(user_prompt, provider, model))
+        response = run_async(default_chat_service.send_message(user_prompt, provider, model))
         
         # Get usage information for the response
         session_settings_manager = get_session_settings_manager()
@@ -195,7 +288,7 @@ def api_chat():
         logger.log_error(f"Chat failed: {str(e)}")
         return jsonify({
             "text": f"Error: {e}",
-            "structured": json.dumps({"answer": f"Error: {e}", "used_connectors": [], "citations": []}),
+            "structured": {"answer": f"Error: {e}", "used_connectors": [], "citations": []},
             "debug": {"error": str(e)}
         }), 500
 
@@ -233,7 +326,7 @@ def api_get_usage(provider_key):
 @app.post("/api/usage/update")
 def api_update_usage():
     """Update usage for a specific provider."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     session_settings_manager = get_session_settings_manager()
     
     try:
@@ -244,7 +337,8 @@ def api_update_usage():
             response_tokens=data.get("response_tokens", 0),
             api_calls=data.get("api_calls", 1)
         )
-        
+        _refresh_session_manager_cache(g.session_id, session_settings_manager)
+
         if success:
             return jsonify({"success": True})
         else:
@@ -261,6 +355,7 @@ def api_reset_usage(provider_key):
     
     try:
         success = session_settings_manager.reset_provider_usage(provider_key)
+        _refresh_session_manager_cache(g.session_id, session_settings_manager)
         if success:
             return jsonify({"success": True})
         else:
@@ -284,10 +379,9 @@ def api_get_session_logs(session_id):
 @app.get("/api/logs/current")
 def api_get_current_session_logs():
     """Get logs for the current session."""
-    session_id = session.get('session_id', str(uuid.uuid4()))
     try:
-        logs = logging_service.get_session_logs(session_id)
-        return jsonify({"session_id": session_id, "logs": logs})
+        logs = logging_service.get_session_logs(g.session_id)
+        return jsonify({"session_id": g.session_id, "logs": logs})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -326,22 +420,19 @@ def api_get_all_sessions():
 @app.get("/api/logs/session-id")
 def api_get_current_session_id():
     """Get the current session ID."""
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    return jsonify({"session_id": session_id})
+    return jsonify({"session_id": g.session_id})
 
 
 # Token Calculation API Endpoints
 @app.post("/api/tokens/count")
 def api_count_tokens():
     """Count tokens for a given text and provider."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     text = data.get("text", "").strip()
     provider = data.get("provider", "openai")
     model = data.get("model")
     
-    # Get session logger
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    logger = logging_service.get_logger(session_id)
+    logger = g.logger
     
     logger.log_api_call("/api/tokens/count", "POST", {
         "text_length": len(text),
@@ -373,13 +464,11 @@ def api_count_tokens():
 @app.post("/api/tokens/analyze")
 def api_analyze_text():
     """Comprehensive text analysis with token counts for specified providers."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     text = data.get("text", "").strip()
     providers = data.get("providers", ["openai", "anthropic", "google"])
     
-    # Get session logger
-    session_id = session.get('session_id', str(uuid.uuid4()))
-    logger = logging_service.get_logger(session_id)
+    logger = g.logger
     
     logger.log_api_call("/api/tokens/analyze", "POST", {
         "text_length": len(text),
@@ -395,12 +484,21 @@ def api_analyze_text():
         return jsonify({"error": str(e)}), 500
 
 
+@functools.lru_cache(maxsize=16)
+def _models_payload(provider: str) -> bytes:
+    """Pre-serialized model list for a provider (static per process)."""
+    models = token_calculator.get_available_models(provider)
+    payload = {"provider": provider, "models": models}
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
 @app.get("/api/tokens/models/<provider>")
 def api_get_models(provider):
     """Get available models for a specific provider."""
     try:
-        models = token_calculator.get_available_models(provider)
-        return jsonify({"provider": provider, "models": models})
+        return app.response_class(_models_payload(provider), mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -421,7 +519,7 @@ def api_get_model_info(provider, model):
 @app.post("/api/tokens/estimate-cost")
 def api_estimate_cost():
     """Estimate cost for a complete request."""
-    data = request.get_json(force=True)
+    data = read_json(request)
     input_tokens = data.get("input_tokens", 0)
     output_tokens = data.get("output_tokens", 0)
     provider = data.get("provider", "openai")
@@ -445,36 +543,27 @@ def api_get_token_settings():
     """Get settings for token calculator (enabled providers and their default models)."""
     try:
         session_settings_manager = get_session_settings_manager()
-        settings = session_settings_manager.get_settings()
         
-        # Get session logger
-        session_id = session.get('session_id', str(uuid.uuid4()))
-        logger = logging_service.get_logger(session_id)
-        
-        # Build provider settings for token calculator
-        token_settings = {
-            "providers": {},
-            "default_provider": None
-        }
-        
-        # Add enabled providers with their default models
-        for provider_key, provider_config in settings.providers.items():
-            if provider_config.enabled:
-                token_settings["providers"][provider_key] = {
-                    "name": provider_config.name,
-                    "default_model": provider_config.default_model,
-                    "enabled": provider_config.enabled
-                }
-                # Set first enabled provider as default
-                if token_settings["default_provider"] is None:
-                    token_settings["default_provider"] = provider_key
-        
-        logger.log_api_call("/api/tokens/settings", "GET", token_settings)
-        return jsonify(token_settings)
+        # Serve the pre-serialized payload; it is rebuilt only when the
+        # session settings change
+        payload = session_settings_manager.get_token_settings_json()
+        g.logger.log_api_call("/api/tokens/settings", "GET")
+        return app.response_class(payload, mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# Optional ASGI entry point for uvicorn/hypercorn deployments, e.g.
+# `uvicorn app:asgi_app --workers 4`. Handlers stay sync WSGI views:
+# Flask runs an async view's coroutine on a per-request loop anyway, so
+# the shared background loop above remains the bridge for MCP work.
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    asgi_app = WsgiToAsgi(app)
+except Exception:
+    asgi_app = None
+
+
 if __name__ == "__main__":
     app.run(
         host="127.0.0.1", 
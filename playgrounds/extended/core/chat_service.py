@@ -4,20 +4,111 @@ Handles chat interactions and response processing.
 """
 import json
 import asyncio
+import os
+import time
+from collections import deque
 from typing import Dict, Any, Optional
+
+# Optional: pip install orjson
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from .models import ChatResponse, ChatMessage, MCPGitHubConfig, MCPPostgresConfig
 from .llm_providers import LLMProviderFactory, LLMProvider
 from .mcp_connectors import MCPConnectorFactory, GitHubMCPConnector, PostgresMCPConnector
 from .prompt_optimizer import PromptOptimizer, TextRenderer
 from .settings import SettingsManager
 
+# Short-TTL cache for MCP fetch results keyed by connector config. Issues
+# and papers rarely change between consecutive chat turns, so most turns
+# become pure prompt assembly. Per-key locks coalesce concurrent misses.
+# Prompt/response previews copy tens of KB per request into the debug
+# payload; set DEBUG_PROMPTS=0 to skip building them.
+DEBUG_PROMPTS = os.getenv("DEBUG_PROMPTS", "1") == "1"
+
+# Bound the in-memory conversation history so returning it stays O(max)
+# instead of growing with the life of the session.
+_MAX_HISTORY = 200
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps_pretty(obj: Any) -> str:
+    """Serialize with 2-space indent, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+_MCP_FETCH_TTL_S = 30.0
+_MCP_FETCH_CACHE: Dict[tuple, tuple] = {}
+_MCP_FETCH_LOCKS: Dict[tuple, asyncio.Lock] = {}
+
+
+async def _cached_fetch(key: tuple, fetch):
+    """Run a fetch through the TTL cache; returns (result, "HIT"/"MISS")."""
+    lock = _MCP_FETCH_LOCKS.setdefault(key, asyncio.Lock())
+    async with lock:
+        now = time.monotonic()
+        cached = _MCP_FETCH_CACHE.get(key)
+        if cached is not None and now - cached[0] < _MCP_FETCH_TTL_S:
+            return cached[1], "HIT"
+        result = await fetch()
+        _MCP_FETCH_CACHE[key] = (now, result)
+        return result, "MISS"
+
+
+def _github_cache_key(gh_config: MCPGitHubConfig) -> tuple:
+    return ("github", gh_config.url, gh_config.auth_token, gh_config.repo, 3, 5)
+
+
+def _postgres_cache_key(pg_config: MCPPostgresConfig) -> tuple:
+    return ("postgres", pg_config.url, pg_config.auth_token, pg_config.sample_sql, 8)
+
+
+# Static system prompt for chat completions, hoisted out of the hot path.
+_SYSTEM_PROMPT = """You are an AI Research Paper Analysis Assistant that helps developers and researchers by:
+
+1. **Analyzing GitHub Issues**: Extract project requirements, technical specifications, and implementation needs from GitHub issues and comments
+2. **Research Paper Discovery**: Find and analyze relevant AI research papers that match project requirements
+3. **Recommendation Generation**: Provide actionable recommendations combining project requirements with research insights
+
+**Your Capabilities:**
+- Parse GitHub issues to understand project scope and technical requirements
+- Match requirements with relevant research papers from the database
+- Provide implementation guidance based on research findings
+- Suggest relevant papers for literature reviews and gap analysis
+- Identify research gaps and collaboration opportunities
+
+**Response Format:** Reply ONLY with the JSON schema specified below.
+
+Return ONLY valid JSON with keys:
+{
+  "answer": string,
+  "used_connectors": string[],
+  "citations": string[]
+}"""
+
+_SYSTEM_PROMPT_PREVIEW = _SYSTEM_PROMPT[:800]
+
 
 class ChatService:
     """Main chat service that coordinates all chat operations."""
     
     def __init__(self, settings_manager: SettingsManager):
         self.settings_manager = settings_manager
-        self._conversation_history: list[ChatMessage] = []
+        self._conversation_history: deque[ChatMessage] = deque(maxlen=_MAX_HISTORY)
+        self._optimizer: Optional[PromptOptimizer] = None
+        self._optimizer_key: Optional[tuple] = None
+    
+    def _get_optimizer(self, settings) -> PromptOptimizer:
+        """Reuse one PromptOptimizer until the optimizer settings change."""
+        key = (tuple(sorted(settings.optimizer.to_dict().items())), id(settings.providers))
+        if self._optimizer is None or self._optimizer_key != key:
+            self._optimizer = PromptOptimizer(settings.optimizer, settings.providers)
+            self._optimizer_key = key
+        return self._optimizer
     
     def add_message(self, role: str, content: str) -> None:
         """Add a message to the conversation history."""
@@ -26,7 +117,7 @@ class ChatService:
     
     def get_conversation_history(self) -> list[ChatMessage]:
         """Get the conversation history."""
-        return self._conversation_history.copy()
+        return list(self._conversation_history)
     
     def clear_history(self) -> None:
         """Clear the conversation history."""
@@ -50,45 +141,58 @@ class ChatService:
         
         debug = {"github": None, "postgres": None, "optimizer": None}
         
-        # Fetch GitHub issues
-        issues_text = ""
-        try:
+        async def _fetch_github():
             if logger:
                 logger.log_mcp_connection("github", gh_config.to_dict())
             print(f"[MCP] Connecting to GitHub: {gh_config.url}")
             gh_connector = MCPConnectorFactory.create_github_connector(gh_config)
             print(f"[MCP] Fetching GitHub issues from repo: {gh_config.repo}")
-            gh_result = await gh_connector.fetch_issues_and_comments(limit_issues=3, limit_comments=5)
+            return await gh_connector.fetch_issues_and_comments(limit_issues=3, limit_comments=5)
+        
+        async def _fetch_postgres():
+            if logger:
+                logger.log_mcp_connection("postgres", pg_config.to_dict())
+            print(f"[MCP] Connecting to PostgreSQL: {pg_config.url}")
+            pg_connector = MCPConnectorFactory.create_postgres_connector(pg_config)
+            print(f"[MCP] Fetching research papers with SQL: {pg_config.sample_sql}")
+            return await pg_connector.fetch_research_papers(limit_rows=8)
+        
+        # Fetch both contexts concurrently through the TTL cache; one
+        # failure must not cancel the other
+        gh_out, pg_out = await asyncio.gather(
+            _cached_fetch(_github_cache_key(gh_config), _fetch_github),
+            _cached_fetch(_postgres_cache_key(pg_config), _fetch_postgres),
+            return_exceptions=True
+        )
+        gh_result, gh_cache = gh_out if not isinstance(gh_out, Exception) else (gh_out, "MISS")
+        pg_result, pg_cache = pg_out if not isinstance(pg_out, Exception) else (pg_out, "MISS")
+        debug["mcp_cache"] = {"github": gh_cache, "postgres": pg_cache}
+        
+        issues_text = ""
+        if isinstance(gh_result, Exception):
+            debug["github_error"] = str(gh_result)
+            print(f"[MCP] GitHub error: {gh_result}")
+            if logger:
+                logger.log_mcp_error("github", str(gh_result))
+        else:
             debug["github"] = gh_result.get("debug")
             issues_text = TextRenderer.render_issues_text(gh_result.get("issues", []))
             print(f"[MCP] GitHub result: {len(gh_result.get('issues', []))} issues, debug: {debug['github']}")
             if logger:
                 logger.log_mcp_success("github", gh_result)
-        except Exception as e:
-            debug["github_error"] = str(e)
-            print(f"[MCP] GitHub error: {e}")
-            if logger:
-                logger.log_mcp_error("github", str(e))
         
-        # Fetch research papers
         papers_text = ""
-        try:
+        if isinstance(pg_result, Exception):
+            debug["postgres_error"] = str(pg_result)
+            print(f"[MCP] PostgreSQL error: {pg_result}")
             if logger:
-                logger.log_mcp_connection("postgres", pg_config.to_dict())
-            print(f"[MCP] Connecting to PostgreSQL: {pg_config.url}")
-            pg_connector = MCPConnectorFactory.create_postgres_connector(pg_config)
-            print(f"[MCP] Fetching research papers with SQL: {pg_config.sample_sql}")
-            pg_result = await pg_connector.fetch_research_papers(limit_rows=8)
+                logger.log_mcp_error("postgres", str(pg_result))
+        else:
             debug["postgres"] = pg_result.get("debug")
             papers_text = TextRenderer.render_papers_text(pg_result.get("rows", []))
             print(f"[MCP] PostgreSQL result: {len(pg_result.get('rows', []))} rows, debug: {debug['postgres']}")
             if logger:
                 logger.log_mcp_success("postgres", pg_result)
-        except Exception as e:
-            debug["postgres_error"] = str(e)
-            print(f"[MCP] PostgreSQL error: {e}")
-            if logger:
-                logger.log_mcp_error("postgres", str(e))
         
         # Get provider configuration
         provider_config = settings.providers.get(provider_key) or settings.providers[settings.default_provider]
@@ -113,14 +217,18 @@ class ChatService:
             except Exception as e:
                 print(f"[USAGE] Error updating usage: {e}")
         
-        # Build optimized prompt with usage tracking
-        optimizer = PromptOptimizer(settings.optimizer, settings.providers, user_provider=provider_key, usage_callback=usage_callback)
-        result = optimizer.build_optimized_prompt(
+        # Build optimized prompt with usage tracking. The optimizer makes
+        # blocking LLM calls, so run it off the event loop
+        optimizer = self._get_optimizer(settings)
+        result = await asyncio.to_thread(
+            optimizer.build_optimized_prompt,
             user_prompt=user_prompt,
             issues_text=issues_text,
             papers_text=papers_text,
             provider_cw_tokens=context_window,
-            logger=logger
+            logger=logger,
+            user_provider=provider_key,
+            usage_callback=usage_callback
         )
         
         debug["optimizer"] = result.debug
@@ -156,35 +264,50 @@ class ChatService:
         gh_config = MCPGitHubConfig.from_dict(gh_config_dict)
         pg_config = MCPPostgresConfig.from_dict(pg_config_dict)
         
-        # Fetch fresh data
+        # Fetch fresh data concurrently
         issues_text = ""
         papers_text = ""
         debug = {"mcp": {"github": None, "postgres": None}, "optimizer": None, "provider": None}
         
-        try:
-            gh_connector = MCPConnectorFactory.create_github_connector(gh_config)
-            gh_result = await gh_connector.fetch_issues_and_comments(limit_issues=3, limit_comments=5)
+        gh_connector = MCPConnectorFactory.create_github_connector(gh_config)
+        pg_connector = MCPConnectorFactory.create_postgres_connector(pg_config)
+        gh_out, pg_out = await asyncio.gather(
+            _cached_fetch(
+                _github_cache_key(gh_config),
+                lambda: gh_connector.fetch_issues_and_comments(limit_issues=3, limit_comments=5),
+            ),
+            _cached_fetch(
+                _postgres_cache_key(pg_config),
+                lambda: pg_connector.fetch_research_papers(limit_rows=8),
+            ),
+            return_exceptions=True
+        )
+        gh_result, gh_cache = gh_out if not isinstance(gh_out, Exception) else (gh_out, "MISS")
+        pg_result, pg_cache = pg_out if not isinstance(pg_out, Exception) else (pg_out, "MISS")
+        debug["mcp"]["cache"] = {"github": gh_cache, "postgres": pg_cache}
+        
+        if isinstance(gh_result, Exception):
+            debug["mcp"]["github_error"] = str(gh_result)
+        else:
             debug["mcp"]["github"] = gh_result.get("debug")
             issues_text = TextRenderer.render_issues_text(gh_result.get("issues", []))
-        except Exception as e:
-            debug["mcp"]["github_error"] = str(e)
         
-        try:
-            pg_connector = MCPConnectorFactory.create_postgres_connector(pg_config)
-            pg_result = await pg_connector.fetch_research_papers(limit_rows=8)
+        if isinstance(pg_result, Exception):
+            debug["mcp"]["postgres_error"] = str(pg_result)
+        else:
             debug["mcp"]["postgres"] = pg_result.get("debug")
             papers_text = TextRenderer.render_papers_text(pg_result.get("rows", []))
-        except Exception as e:
-            debug["mcp"]["postgres_error"] = str(e)
         
         # Build optimized prompt
         context_window = provider_config.context_window or 128000
-        optimizer = PromptOptimizer(settings.optimizer, settings.providers, user_provider=provider_key)
-        opt_result = optimizer.build_optimized_prompt(
+        optimizer = self._get_optimizer(settings)
+        opt_result = await asyncio.to_thread(
+            optimizer.build_optimized_prompt,
             user_prompt=user_prompt,
             issues_text=issues_text,
             papers_text=papers_text,
-            provider_cw_tokens=context_window
+            provider_cw_tokens=context_window,
+            user_provider=provider_key
         )
         
         debug["optimizer"] = opt_result.debug
@@ -196,7 +319,10 @@ class ChatService:
             system_prompt = self._get_system_prompt()
             final_prompt = opt_result.optimized_prompt
             
-            raw_response = provider.complete(
+            # The provider call blocks on the LLM HTTP round trip; keep it
+            # off the shared event loop so other requests can progress
+            raw_response = await asyncio.to_thread(
+                provider.complete,
                 prompt=final_prompt,
                 system=system_prompt,
                 temperature=provider_config.temperature
@@ -204,7 +330,7 @@ class ChatService:
             
             # Parse response
             try:
-                structured_response = json.loads(raw_response)
+                structured_response = _json_loads(raw_response)
             except Exception:
                 structured_response = {"answer": raw_response, "used_connectors": [], "citations": []}
             
@@ -217,33 +343,30 @@ class ChatService:
                 "model": model,
                 "endpoint": provider_config.base_url,
                 "request": {
-                    "system_preview": system_prompt[:800],
-                    "prompt_preview": final_prompt[:800],
                     "temperature": provider_config.temperature,
                 },
-                "response": {
-                    "raw_preview": raw_response[:1400]
-                },
-                "parsed": {
-                    "structured_preview": str(structured_response)[:1400]
-                }
             }
+            if DEBUG_PROMPTS:
+                provider_debug["request"]["system_preview"] = _SYSTEM_PROMPT_PREVIEW
+                provider_debug["request"]["prompt_preview"] = final_prompt[:800]
+                provider_debug["response"] = {"raw_preview": raw_response[:1400]}
+                provider_debug["parsed"] = {"structured_preview": str(structured_response)[:1400]}
             
             debug["provider"] = provider_debug
             debug["final_prompt_tokens_est"] = optimizer.estimate_tokens(final_prompt)
             
             return ChatResponse(
                 text=raw_response,
-                structured=json.dumps(structured_response, ensure_ascii=False, indent=2),
+                structured=structured_response,
                 debug=debug
             )
             
         except Exception as e:
-            error_response = json.dumps({
+            error_response = {
                 "answer": f"Provider error: {e}",
                 "used_connectors": [],
                 "citations": []
-            })
+            }
             
             debug["provider"] = {
                 "name": provider_config.name or provider_key,
@@ -253,34 +376,14 @@ class ChatService:
             }
             
             return ChatResponse(
-                text=error_response,
+                text=_json_dumps_pretty(error_response),
                 structured=error_response,
                 debug=debug
             )
     
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the chat."""
-        return """You are an AI Research Paper Analysis Assistant that helps developers and researchers by:
-
-1. **Analyzing GitHub Issues**: Extract project requirements, technical specifications, and implementation needs from GitHub issues and comments
-2. **Research Paper Discovery**: Find and analyze relevant AI research papers that match project requirements
-3. **Recommendation Generation**: Provide actionable recommendations combining project requirements with research insights
-
-**Your Capabilities:**
-- Parse GitHub issues to understand project scope and technical requirements
-- Match requirements with relevant research papers from the database
-- Provide implementation guidance based on research findings
-- Suggest relevant papers for literature reviews and gap analysis
-- Identify research gaps and collaboration opportunities
-
-**Response Format:** Reply ONLY with the JSON schema specified below.
-
-Return ONLY valid JSON with keys:
-{
-  "answer": string,
-  "used_connectors": string[],
-  "citations": string[]
-}"""
+        return _SYSTEM_PROMPT
 
 
 class ChatSessionManager:
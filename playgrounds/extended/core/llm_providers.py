@@ -2,162 +2,385 @@
 LLM providers module following the Strategy pattern.
 Each provider implements the LLMProvider interface.
 """
+import asyncio
+import functools
+import logging
 import requests
 import math
-from typing import Optional, Dict, Any
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
 from abc import ABC, abstractmethod
 from .models import LLMProvider, ProviderConfig
 import json
 
+_log = logging.getLogger(__name__)
+
+# Optional: pip install httpx
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Fallback session so blocking complete() calls reuse pooled keep-alive
+# connections when httpx is not installed.
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=64)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Shared clients so concurrent calls multiplex over pooled connections.
+# HTTP/2 (the httpx[http2] extra) lets many in-flight completions share a
+# single connection to providers that support it.
+_sync_client = None
+_async_client = None
+if httpx is not None:
+    try:
+        import h2  # noqa: F401 -- installed via httpx[http2]
+        _HTTP2 = True
+    except ImportError:
+        _HTTP2 = False
+    _sync_client = httpx.Client(
+        http2=_HTTP2,
+        timeout=180.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    )
+    _async_client = httpx.AsyncClient(
+        http2=_HTTP2,
+        timeout=180,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+    )
+
+# Status errors differ between the two stacks; complete() catches both.
+_HTTP_STATUS_ERRORS = (requests.HTTPError,) if httpx is None else \
+    (requests.HTTPError, httpx.HTTPStatusError)
+
+
+def _post(url, **kwargs):
+    """POST via the shared HTTP/2 client when available, else the Session."""
+    if _sync_client is not None:
+        kwargs.pop("stream", None)
+        return _sync_client.post(url, **kwargs)
+    return _session.post(url, **kwargs)
+
+
+def _get(url, **kwargs):
+    """GET via the shared HTTP/2 client when available, else the Session."""
+    if _sync_client is not None:
+        return _sync_client.get(url, **kwargs)
+    return _session.get(url, **kwargs)
+
+
+async def aclose() -> None:
+    """Close the shared async HTTP client at process shutdown."""
+    if _async_client is not None:
+        await _async_client.aclose()
+
+
+# Skip the estimate cache for very large texts to bound memory usage.
+_ESTIMATE_CACHE_MAX_CHARS = 16384
+
+
+@functools.lru_cache(maxsize=8)
+def _get_tokenizer():
+    """Load the shared tiktoken encoding once; None when unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count tokens with the real tokenizer, falling back to chars/4."""
+    encoding = _get_tokenizer()
+    if encoding is not None:
+        return max(1, len(encoding.encode(text)))
+    return max(1, math.ceil(len(text) / 4))
+
+
+@functools.lru_cache(maxsize=4096)
+def _count_tokens_cached(text: str) -> int:
+    """Memoized token count for repeated texts (system prompts, templates)."""
+    return _count_tokens(text)
+
+
+@dataclass
+class TokenBudget:
+    """Token accounting for a single completion request."""
+    context_window: int
+    prompt_tokens: int
+    system_tokens: int
+    total_input_tokens: int
+    reserved_for_response: int
+    available_tokens: int
+    max_completion_tokens: int
+
 
 class BaseLLMProvider(LLMProvider):
     """Base class for LLM providers with common functionality."""
-    
+
+    provider_name = "base"
+    log_label = "Base"
+
     def __init__(self, config: ProviderConfig):
         self.config = config
-    
+
     def get_context_window(self) -> int:
         """Get the context window size in tokens."""
         return self.config.context_window
-    
+
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count for text."""
-        return max(1, math.ceil(len(text) / 4))
-    
+        if len(text) <= _ESTIMATE_CACHE_MAX_CHARS:
+            return _count_tokens_cached(text)
+        return _count_tokens(text)
+
     def _trim_to_tokens(self, text: str, max_tokens: int) -> str:
         """Trim text to fit within token limit."""
         if self._estimate_tokens(text) <= max_tokens:
             return text
+        encoding = _get_tokenizer()
+        if encoding is not None:
+            return encoding.decode(encoding.encode(text)[:max(0, max_tokens)])
         return text[:max(0, max_tokens * 4)]
-    
-    def _log_request(self, logger, provider: str, model: str, prompt: str, system: str = None, 
+
+    def _log_request(self, logger, provider: str, model: str, prompt: str, system: str = None,
                     temperature: float = None, max_tokens: int = None):
         """Log LLM request if logger is provided."""
         if logger:
             logger.log_llm_request(provider, model, prompt, system, temperature, max_tokens)
-    
+
     def _log_response(self, logger, provider: str, response: str, tokens_used: int = None):
         """Log LLM response if logger is provided."""
         if logger:
             logger.log_llm_response(provider, response, tokens_used)
-    
+
     def _log_error(self, logger, provider: str, error: str):
         """Log LLM error if logger is provided."""
         if logger:
             logger.log_llm_error(provider, error)
 
+    def _compute_token_budget(self, prompt: str, system: Optional[str] = None) -> TokenBudget:
+        """Compute the completion-token budget for a request.
+
+        Reserves 25% of the context window (at least 1000 tokens) for the
+        response and clamps the remainder to the provider-specific cap.
+        """
+        context_window = self.get_context_window()
+        prompt_tokens = self._estimate_tokens(prompt)
+        system_tokens = self._estimate_tokens(system) if system else 0
+        total_input_tokens = prompt_tokens + system_tokens
+        reserved_for_response = max(1000, int(context_window * 0.25))
+        available_tokens = context_window - total_input_tokens - reserved_for_response
+        max_completion_tokens = max(100, min(available_tokens, self.config.max_completion_tokens))
+        return TokenBudget(
+            context_window=context_window,
+            prompt_tokens=prompt_tokens,
+            system_tokens=system_tokens,
+            total_input_tokens=total_input_tokens,
+            reserved_for_response=reserved_for_response,
+            available_tokens=available_tokens,
+            max_completion_tokens=max_completion_tokens,
+        )
+
+    def _build_request(self, prompt: str, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None) -> Tuple:
+        """Return (url, params, headers, payload) for a completion request."""
+        raise NotImplementedError
+
+    def _parse_response(self, data: Dict[str, Any], logger=None) -> str:
+        """Parse a completion response body into the output text."""
+        raise NotImplementedError
+
+    def complete(self, prompt: str, system: Optional[str] = None,
+                temperature: Optional[float] = None, logger=None) -> str:
+        """Generate a completion over the blocking HTTP path."""
+        url, params, headers, payload = self._build_request(prompt, system, temperature, logger)
+
+        # stream=True avoids buffering the raw body up front; response.json()
+        # still reads it, but incrementally rather than in one allocation.
+        response = _post(url, params=params, headers=headers, json=payload,
+                         timeout=180, stream=True)
+        try:
+            response.raise_for_status()
+        except _HTTP_STATUS_ERRORS as e:
+            body = ""
+            try:
+                body = response.text[:2000]
+            except Exception:
+                pass
+            _log.error("[LLM-%s] API error: %s :: %s", self.log_label, e, body)
+            self._log_error(logger, self.provider_name, f"{e} :: {body}")
+            raise requests.HTTPError(f"{e} :: {body}") from None
+
+        return self._parse_response(response.json(), logger)
+
+    async def acomplete(self, prompt: str, system: Optional[str] = None,
+                        temperature: Optional[float] = None, logger=None,
+                        client=None) -> str:
+        """Generate a completion via the shared async HTTP client.
+
+        Builds the identical request as complete(), so callers can
+        asyncio.gather many prompts concurrently over pooled connections.
+        An explicit client can be passed when the caller runs its own
+        event loop (the shared client is bound to the loop it first ran on).
+        """
+        client = client or _async_client
+        if client is None:
+            raise RuntimeError("httpx not installed. pip install httpx")
+
+        url, params, headers, payload = self._build_request(prompt, system, temperature, logger)
+
+        response = await client.post(url, params=params, headers=headers, json=payload)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            body = response.text[:2000]
+            _log.error("[LLM-%s] API error: %s :: %s", self.log_label, e, body)
+            self._log_error(logger, self.provider_name, f"{e} :: {body}")
+            raise
+
+        return self._parse_response(response.json(), logger)
+
+    def complete_batch(self, prompts: list, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None,
+                       use_batch_api: bool = True) -> list:
+        """Complete many independent prompts and return their outputs in order.
+
+        The base implementation fans the prompts out concurrently over
+        acomplete() when httpx is available, falling back to sequential
+        complete() calls. Providers with a native batch endpoint override
+        this (honouring use_batch_api=False to force the fan-out path).
+        """
+        if httpx is not None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # A per-batch client keeps its pooled connections bound to the
+                # loop asyncio.run creates (the shared client's connections
+                # would outlive that loop and fail on the next batch).
+                async def _gather():
+                    async with httpx.AsyncClient(
+                        http2=_HTTP2,
+                        timeout=180,
+                        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+                    ) as client:
+                        return await asyncio.gather(
+                            *[self.acomplete(p, system, temperature, logger, client=client)
+                              for p in prompts]
+                        )
+                return asyncio.run(_gather())
+        # No httpx, or called from a thread already running a loop where
+        # asyncio.run would raise: complete sequentially over the sync path.
+        return [self.complete(p, system, temperature, logger) for p in prompts]
+
+    def _poll_batch(self, fetch_status, is_done, timeout: float = 3600.0):
+        """Poll fetch_status() with exponential backoff until is_done(status)."""
+        deadline = time.monotonic() + timeout
+        delay = 1.0
+        while True:
+            status = fetch_status()
+            if is_done(status):
+                return status
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{self.log_label} batch did not finish within {timeout:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
 
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI API provider implementation."""
-    
-    def complete(self, prompt: str, system: Optional[str] = None, 
-                temperature: Optional[float] = None, logger=None) -> str:
-        """Generate completion using OpenAI API."""
+
+    provider_name = "openai"
+    log_label = "OpenAI"
+
+    def _build_request(self, prompt: str, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None) -> Tuple:
+        """Build the chat/completions request."""
         if not self.config.api_key:
-            print(f"[LLM-OpenAI] Error: API key missing")
+            _log.error("[LLM-OpenAI] Error: API key missing")
             raise RuntimeError("OpenAI API key missing")
-        
+
         url = self._get_endpoint("chat/completions")
         headers = {
             "Authorization": f"Bearer {self.config.api_key}",
             "Content-Type": "application/json"
         }
-        
+
         messages = []
         if system:
             messages.append({"role": "system", "content": system})
         messages.append({"role": "user", "content": prompt})
-        
+
         # Calculate dynamic max_completion_tokens based on context window and prompt length
-        context_window = self.get_context_window()
-        prompt_tokens = self._estimate_tokens(prompt)
-        system_tokens = self._estimate_tokens(system) if system else 0
-        total_input_tokens = prompt_tokens + system_tokens
-        
-        # Reserve some tokens for the response (25% of context window, but at least 1000)
-        reserved_for_response = max(1000, int(context_window * 0.25))
-        
-        # Calculate available tokens for completion
-        available_tokens = context_window - total_input_tokens - reserved_for_response
-        
-        # Ensure we have reasonable limits and respect provider-specific cap
-        provider_cap = self.config.max_completion_tokens
-        max_completion_tokens = max(100, min(available_tokens, provider_cap))
-        
+        budget = self._compute_token_budget(prompt, system)
+
         # Log the request
-        self._log_request(logger, "openai", self.config.default_model, prompt, system, 
-                         temperature or self.config.temperature, max_completion_tokens)
-        
+        self._log_request(logger, "openai", self.config.default_model, prompt, system,
+                         temperature or self.config.temperature, budget.max_completion_tokens)
+
         payload = {
             "model": self.config.default_model,
             "messages": messages,
-            "max_completion_tokens": max_completion_tokens
+            "max_completion_tokens": budget.max_completion_tokens
         }
-        
+
         # For newer OpenAI models (like GPT-4o, GPT-5), don't include temperature parameter
         # as they only support the default value (1.0) and reject custom values
         # This avoids the "Unsupported value: 'temperature' does not support 0.2" error
         # requested_temp = temperature or self.config.temperature
         # payload["temperature"] = requested_temp  # Commented out to avoid API errors
-        
-        print(f"[LLM-OpenAI] API call to: {url}")
-        print(f"[LLM-OpenAI] Model: {self.config.default_model}")
-        print(f"[LLM-OpenAI] Temperature: {temperature or self.config.temperature}")
-        print(f"[LLM-OpenAI] Context window: {context_window:,} tokens")
-        print(f"[LLM-OpenAI] Prompt tokens: {prompt_tokens:,}")
-        print(f"[LLM-OpenAI] System tokens: {system_tokens:,}")
-        print(f"[LLM-OpenAI] Total input tokens: {total_input_tokens:,}")
-        print(f"[LLM-OpenAI] Reserved for response: {reserved_for_response:,}")
-        print(f"[LLM-OpenAI] Available for completion: {available_tokens:,}")
-        print(f"[LLM-OpenAI] Provider cap: {provider_cap:,}")
-        print(f"[LLM-OpenAI] Max completion tokens: {max_completion_tokens:,}")
-        print(f"[LLM-OpenAI] Prompt length: {len(prompt)} chars")
-        print(f"[LLM-OpenAI] System prompt: {system[:100] if system else 'None'}...")
-        print(f"[LLM-OpenAI] Payload: {json.dumps(payload, indent=2)}")
-        
-        response = requests.post(url, headers=headers, json=payload, timeout=180)
-        try:
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            body = ""
-            try:
-                body = response.text[:2000]
-                print(f"[LLM-OpenAI] Full error response: {body}")
-            except Exception:
-                pass
-            print(f"[LLM-OpenAI] API error: {e} :: {body}")
-            self._log_error(logger, "openai", f"{e} :: {body}")
-            raise requests.HTTPError(f"{e} :: {body}") from None
-        
-        data = response.json()
-        print(f"[LLM-OpenAI] Full API response: {json.dumps(data, indent=2)}")
-        
+
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("[LLM-OpenAI] API call to: %s", url)
+            _log.debug("[LLM-OpenAI] Model: %s", self.config.default_model)
+            _log.debug("[LLM-OpenAI] Temperature: %s", temperature or self.config.temperature)
+            _log.debug("[LLM-OpenAI] Context window: %d tokens", budget.context_window)
+            _log.debug("[LLM-OpenAI] Prompt tokens: %d", budget.prompt_tokens)
+            _log.debug("[LLM-OpenAI] System tokens: %d", budget.system_tokens)
+            _log.debug("[LLM-OpenAI] Total input tokens: %d", budget.total_input_tokens)
+            _log.debug("[LLM-OpenAI] Reserved for response: %d", budget.reserved_for_response)
+            _log.debug("[LLM-OpenAI] Available for completion: %d", budget.available_tokens)
+            _log.debug("[LLM-OpenAI] Provider cap: %d", self.config.max_completion_tokens)
+            _log.debug("[LLM-OpenAI] Max completion tokens: %d", budget.max_completion_tokens)
+            _log.debug("[LLM-OpenAI] Prompt length: %d chars", len(prompt))
+            _log.debug("[LLM-OpenAI] System prompt: %s...", system[:100] if system else 'None')
+            _log.debug("[LLM-OpenAI] Payload: %s", json.dumps(payload, indent=2))
+
+        return url, None, headers, payload
+
+    def _parse_response(self, data: Dict[str, Any], logger=None) -> str:
+        """Parse the chat/completions response."""
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("[LLM-OpenAI] Full API response: %s", json.dumps(data, indent=2))
+
         # Check if we have choices
         if not data.get("choices"):
-            print(f"[LLM-OpenAI] Error: No choices in response")
+            _log.error("[LLM-OpenAI] Error: No choices in response")
             return ""
-        
+
         # Check if the first choice has a message
         first_choice = data["choices"][0]
         if not first_choice.get("message"):
-            print(f"[LLM-OpenAI] Error: No message in first choice")
+            _log.error("[LLM-OpenAI] Error: No message in first choice")
             return ""
-        
+
         # Check if the message has content
         message = first_choice["message"]
         if not message.get("content"):
-            print(f"[LLM-OpenAI] Error: No content in message")
+            _log.error("[LLM-OpenAI] Error: No content in message")
             # Check if it's due to length limit
             if first_choice.get("finish_reason") == "length":
-                print(f"[LLM-OpenAI] Warning: Response truncated due to length limit")
+                _log.warning("[LLM-OpenAI] Warning: Response truncated due to length limit")
                 return "Response was truncated due to length limit. Please try with a shorter prompt or increase token limits."
             return ""
-        
+
         result = message["content"].strip()
-        
+
         # If result is empty but we have a finish reason, provide context
         if not result and first_choice.get("finish_reason"):
-            print(f"[LLM-OpenAI] Warning: Empty content with finish_reason: {first_choice['finish_reason']}")
+            _log.warning("[LLM-OpenAI] Warning: Empty content with finish_reason: %s", first_choice['finish_reason'])
             if first_choice["finish_reason"] == "length":
                 error_msg = "Response was truncated due to length limit. Please try with a shorter prompt."
                 self._log_error(logger, "openai", error_msg)
@@ -170,15 +393,15 @@ class OpenAIProvider(BaseLLMProvider):
                 error_msg = f"Response completed with finish reason: {first_choice['finish_reason']}. Please try again."
                 self._log_error(logger, "openai", error_msg)
                 return error_msg
-        
-        print(f"[LLM-OpenAI] Response length: {len(result)} chars")
-        print(f"[LLM-OpenAI] Response preview: {result[:200]}...")
-        
+
+        _log.debug("[LLM-OpenAI] Response length: %d chars", len(result))
+        _log.debug("[LLM-OpenAI] Response preview: %.200s...", result)
+
         # Log the response
         self._log_response(logger, "openai", result)
-        
+
         return result
-    
+
     def _get_endpoint(self, resource: str = "chat/completions") -> str:
         """Get the correct endpoint URL."""
         base = (self.config.base_url or "https://api.openai.com").rstrip("/")
@@ -186,93 +409,161 @@ class OpenAIProvider(BaseLLMProvider):
             return f"{base}/{resource.lstrip('/')}"
         return f"{base}/v1/{resource.lstrip('/')}"
 
+    def complete_batch(self, prompts: list, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None,
+                       use_batch_api: bool = True) -> list:
+        """Complete many prompts via the OpenAI Batch API.
+
+        Uploads one JSONL input file, creates a batch against
+        /v1/chat/completions and polls until it finishes, collapsing N
+        round trips into an upload plus a poll loop. Pass
+        use_batch_api=False to fall back to the concurrent fan-out.
+        """
+        if not use_batch_api or not self.config.api_key:
+            return super().complete_batch(prompts, system, temperature, logger, use_batch_api)
+
+        headers = {"Authorization": f"Bearer {self.config.api_key}"}
+        messages_prefix = [{"role": "system", "content": system}] if system else []
+
+        lines = []
+        for i, prompt in enumerate(prompts):
+            budget = self._compute_token_budget(prompt, system)
+            lines.append(json.dumps({
+                "custom_id": f"request-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.config.default_model,
+                    "messages": messages_prefix + [{"role": "user", "content": prompt}],
+                    "max_completion_tokens": budget.max_completion_tokens,
+                },
+            }))
+        jsonl = "\n".join(lines).encode("utf-8")
+
+        upload = _post(
+            self._get_endpoint("files"),
+            headers=headers,
+            files={"file": ("batch.jsonl", jsonl, "application/jsonl")},
+            data={"purpose": "batch"},
+            timeout=180,
+        )
+        upload.raise_for_status()
+        input_file_id = upload.json()["id"]
+
+        created = _post(
+            self._get_endpoint("batches"),
+            headers={**headers, "Content-Type": "application/json"},
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+            timeout=180,
+        )
+        created.raise_for_status()
+        batch_id = created.json()["id"]
+        _log.info("[LLM-OpenAI] Batch %s submitted with %d prompts", batch_id, len(prompts))
+
+        def fetch_status():
+            response = _get(self._get_endpoint(f"batches/{batch_id}"),
+                                    headers=headers, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        status = self._poll_batch(
+            fetch_status,
+            lambda s: s.get("status") in ("completed", "failed", "expired", "cancelled"),
+        )
+        if status.get("status") != "completed":
+            error_msg = f"Batch {batch_id} ended with status {status.get('status')}"
+            self._log_error(logger, "openai", error_msg)
+            raise RuntimeError(error_msg)
+
+        output = _get(
+            self._get_endpoint(f"files/{status['output_file_id']}/content"),
+            headers=headers, timeout=180,
+        )
+        output.raise_for_status()
+
+        results = [""] * len(prompts)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index = int(record["custom_id"].rsplit("-", 1)[1])
+            body = (record.get("response") or {}).get("body") or {}
+            results[index] = self._parse_response(body, logger)
+        return results
+
 
 class AnthropicProvider(BaseLLMProvider):
     """Anthropic API provider implementation."""
-    
-    def complete(self, prompt: str, system: Optional[str] = None, 
-                temperature: Optional[float] = None, logger=None) -> str:
-        """Generate completion using Anthropic API."""
+
+    provider_name = "anthropic"
+    log_label = "Anthropic"
+
+    def _build_request(self, prompt: str, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None) -> Tuple:
+        """Build the messages request."""
         if not self.config.api_key:
-            print(f"[LLM-Anthropic] Error: API key missing")
+            _log.error("[LLM-Anthropic] Error: API key missing")
             raise RuntimeError("Anthropic API key missing")
-        
+
         url = self._get_endpoint("messages")
         headers = {
             "x-api-key": self.config.api_key,
             "anthropic-version": "2023-06-01",
             "content-type": "application/json",
         }
-        
+
         # Calculate dynamic max_tokens based on context window and prompt length
-        context_window = self.get_context_window()
-        prompt_tokens = self._estimate_tokens(prompt)
-        system_tokens = self._estimate_tokens(system) if system else 0
-        total_input_tokens = prompt_tokens + system_tokens
-        
-        # Reserve some tokens for the response (25% of context window, but at least 1000)
-        reserved_for_response = max(1000, int(context_window * 0.25))
-        
-        # Calculate available tokens for completion
-        available_tokens = context_window - total_input_tokens - reserved_for_response
-        
-        # Ensure we have reasonable limits and respect provider-specific cap
-        provider_cap = self.config.max_completion_tokens
-        max_tokens = max(100, min(available_tokens, provider_cap))
-        
+        budget = self._compute_token_budget(prompt, system)
+
         # Log the request
-        self._log_request(logger, "anthropic", self.config.default_model, prompt, system, 
-                         temperature or self.config.temperature, max_tokens)
-        
+        self._log_request(logger, "anthropic", self.config.default_model, prompt, system,
+                         temperature or self.config.temperature, budget.max_completion_tokens)
+
         payload = {
             "model": self.config.default_model,
-            "max_tokens": max_tokens,
+            "max_tokens": budget.max_completion_tokens,
             "temperature": temperature or self.config.temperature,
             "system": system or "You are a helpful assistant.",
             "messages": [{"role": "user", "content": prompt}],
         }
-        
-        print(f"[LLM-Anthropic] API call to: {url}")
-        print(f"[LLM-Anthropic] Model: {self.config.default_model}")
-        print(f"[LLM-Anthropic] Temperature: {temperature or self.config.temperature}")
-        print(f"[LLM-Anthropic] Context window: {context_window:,} tokens")
-        print(f"[LLM-Anthropic] Prompt tokens: {prompt_tokens:,}")
-        print(f"[LLM-Anthropic] System tokens: {system_tokens:,}")
-        print(f"[LLM-Anthropic] Total input tokens: {total_input_tokens:,}")
-        print(f"[LLM-Anthropic] Reserved for response: {reserved_for_response:,}")
-        print(f"[LLM-Anthropic] Available for completion: {available_tokens:,}")
-        print(f"[LLM-Anthropic] Provider cap: {provider_cap:,}")
-        print(f"[LLM-Anthropic] Max tokens: {max_tokens:,}")
-        print(f"[LLM-Anthropic] Prompt length: {len(prompt)} chars")
-        print(f"[LLM-Anthropic] System prompt: {system[:100] if system else 'None'}...")
-        
-        response = requests.post(url, headers=headers, json=payload, timeout=180)
-        try:
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            body = ""
-            try:
-                body = response.text[:2000]
-            except Exception:
-                pass
-            print(f"[LLM-Anthropic] API error: {e} :: {body}")
-            raise requests.HTTPError(f"{e} :: {body}") from None
-        
-        data = response.json()
+
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("[LLM-Anthropic] API call to: %s", url)
+            _log.debug("[LLM-Anthropic] Model: %s", self.config.default_model)
+            _log.debug("[LLM-Anthropic] Temperature: %s", temperature or self.config.temperature)
+            _log.debug("[LLM-Anthropic] Context window: %d tokens", budget.context_window)
+            _log.debug("[LLM-Anthropic] Prompt tokens: %d", budget.prompt_tokens)
+            _log.debug("[LLM-Anthropic] System tokens: %d", budget.system_tokens)
+            _log.debug("[LLM-Anthropic] Total input tokens: %d", budget.total_input_tokens)
+            _log.debug("[LLM-Anthropic] Reserved for response: %d", budget.reserved_for_response)
+            _log.debug("[LLM-Anthropic] Available for completion: %d", budget.available_tokens)
+            _log.debug("[LLM-Anthropic] Provider cap: %d", self.config.max_completion_tokens)
+            _log.debug("[LLM-Anthropic] Max tokens: %d", budget.max_completion_tokens)
+            _log.debug("[LLM-Anthropic] Prompt length: %d chars", len(prompt))
+            _log.debug("[LLM-Anthropic] System prompt: %s...", system[:100] if system else 'None')
+
+        return url, None, headers, payload
+
+    def _parse_response(self, data: Dict[str, Any], logger=None) -> str:
+        """Parse the messages response."""
         output = ""
         for content in data.get("content", []):
             if isinstance(content, dict) and content.get("type") == "text":
                 output += content.get("text", "")
-        
+
         result = output.strip()
-        print(f"[LLM-Anthropic] Response length: {len(result)} chars")
-        print(f"[LLM-Anthropic] Response preview: {result[:200]}...")
-        
+        _log.debug("[LLM-Anthropic] Response length: %d chars", len(result))
+        _log.debug("[LLM-Anthropic] Response preview: %.200s...", result)
+
         # Log the response
         self._log_response(logger, "anthropic", result)
-        
+
         return result
-    
+
     def _get_endpoint(self, resource: str = "messages") -> str:
         """Get the correct endpoint URL."""
         base = (self.config.base_url or "").rstrip("/")
@@ -280,98 +571,163 @@ class AnthropicProvider(BaseLLMProvider):
             return f"{base}/{resource.lstrip('/')}"
         return f"{base}/v1/{resource.lstrip('/')}"
 
+    def complete_batch(self, prompts: list, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None,
+                       use_batch_api: bool = True) -> list:
+        """Complete many prompts via the Anthropic Message Batches API.
+
+        Submits all prompts in one request, polls the batch until its
+        processing ends and downloads the JSONL results. Pass
+        use_batch_api=False to fall back to the concurrent fan-out.
+        """
+        if not use_batch_api or not self.config.api_key:
+            return super().complete_batch(prompts, system, temperature, logger, use_batch_api)
+
+        headers = {
+            "x-api-key": self.config.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        }
+
+        batch_requests = []
+        for i, prompt in enumerate(prompts):
+            budget = self._compute_token_budget(prompt, system)
+            batch_requests.append({
+                "custom_id": f"request-{i}",
+                "params": {
+                    "model": self.config.default_model,
+                    "max_tokens": budget.max_completion_tokens,
+                    "temperature": temperature or self.config.temperature,
+                    "system": system or "You are a helpful assistant.",
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            })
+
+        created = _post(
+            self._get_endpoint("messages/batches"),
+            headers=headers,
+            json={"requests": batch_requests},
+            timeout=180,
+        )
+        created.raise_for_status()
+        batch_id = created.json()["id"]
+        _log.info("[LLM-Anthropic] Batch %s submitted with %d prompts", batch_id, len(prompts))
+
+        def fetch_status():
+            response = _get(self._get_endpoint(f"messages/batches/{batch_id}"),
+                                    headers=headers, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        status = self._poll_batch(fetch_status,
+                                  lambda s: s.get("processing_status") == "ended")
+
+        output = _get(status["results_url"], headers=headers, timeout=180)
+        output.raise_for_status()
+
+        results = [""] * len(prompts)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index = int(record["custom_id"].rsplit("-", 1)[1])
+            result = record.get("result") or {}
+            if result.get("type") == "succeeded":
+                results[index] = self._parse_response(result.get("message") or {}, logger)
+            else:
+                self._log_error(logger, "anthropic",
+                                f"Batch item {record['custom_id']} {result.get('type')}")
+        return results
+
 
 class OllamaProvider(BaseLLMProvider):
     """Ollama local provider implementation."""
-    
-    def complete(self, prompt: str, system: Optional[str] = None, 
-                temperature: Optional[float] = None, logger=None) -> str:
-        """Generate completion using Ollama API."""
+
+    provider_name = "ollama"
+    log_label = "Ollama"
+
+    def _build_request(self, prompt: str, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None) -> Tuple:
+        """Build the generate request."""
         url = f"{self.config.base_url.rstrip('/')}/api/generate"
-        
+
         full_prompt = prompt
         if system:
             full_prompt = f"{system}\n\n{prompt}".strip()
-        
+
         # Calculate dynamic max_tokens based on context window and prompt length
-        context_window = self.get_context_window()
-        prompt_tokens = self._estimate_tokens(full_prompt)
-        
-        # Reserve some tokens for the response (25% of context window, but at least 1000)
-        reserved_for_response = max(1000, int(context_window * 0.25))
-        
-        # Calculate available tokens for completion
-        available_tokens = context_window - prompt_tokens - reserved_for_response
-        
-        # Ensure we have reasonable limits and respect provider-specific cap
-        provider_cap = self.config.max_completion_tokens
-        max_tokens = max(100, min(available_tokens, provider_cap))
-        
+        budget = self._compute_token_budget(full_prompt)
+
         # Log the request
-        self._log_request(logger, "ollama", self.config.default_model, prompt, system, 
-                         temperature or self.config.temperature, max_tokens)
-        
+        self._log_request(logger, "ollama", self.config.default_model, prompt, system,
+                         temperature or self.config.temperature, budget.max_completion_tokens)
+
         payload = {
             "model": self.config.default_model,
             "prompt": full_prompt,
             "stream": False,
             "options": {
                 "temperature": temperature or self.config.temperature,
-                "num_predict": max_tokens
+                "num_predict": budget.max_completion_tokens
             }
         }
-        
-        print(f"[LLM-Ollama] API call to: {url}")
-        print(f"[LLM-Ollama] Model: {self.config.default_model}")
-        print(f"[LLM-Ollama] Context window: {context_window:,} tokens")
-        print(f"[LLM-Ollama] Prompt tokens: {prompt_tokens:,}")
-        print(f"[LLM-Ollama] Max completion tokens: {max_tokens:,}")
-        
-        response = requests.post(url, json=payload, timeout=180)
-        response.raise_for_status()
-        
-        result = response.json().get("response", "").strip()
-        print(f"[LLM-Ollama] Response length: {len(result)} chars")
-        print(f"[LLM-Ollama] Response preview: {result[:200]}...")
-        
+
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("[LLM-Ollama] API call to: %s", url)
+            _log.debug("[LLM-Ollama] Model: %s", self.config.default_model)
+            _log.debug("[LLM-Ollama] Context window: %d tokens", budget.context_window)
+            _log.debug("[LLM-Ollama] Prompt tokens: %d", budget.prompt_tokens)
+            _log.debug("[LLM-Ollama] Max completion tokens: %d", budget.max_completion_tokens)
+
+        return url, None, None, payload
+
+    def _parse_response(self, data: Dict[str, Any], logger=None) -> str:
+        """Parse the generate response."""
+        result = data.get("response", "").strip()
+        _log.debug("[LLM-Ollama] Response length: %d chars", len(result))
+        _log.debug("[LLM-Ollama] Response preview: %.200s...", result)
+
         # Log the response
         self._log_response(logger, "ollama", result)
-        
+
         return result
 
 
 class GoogleProvider(BaseLLMProvider):
     """Google Gemini API provider implementation."""
-    
-    def complete(self, prompt: str, system: Optional[str] = None, 
-                temperature: Optional[float] = None, logger=None) -> str:
-        """Generate completion using Google Gemini API."""
-        endpoint = f"{self.config.base_url.rstrip('/')}/v1beta/models/{self.config.default_model}:generateContent"
+
+    provider_name = "google"
+    log_label = "Google"
+
+    def _build_request(self, prompt: str, system: Optional[str] = None,
+                       temperature: Optional[float] = None, logger=None) -> Tuple:
+        """Build the generateContent request."""
+        url = f"{self.config.base_url.rstrip('/')}/v1beta/models/{self.config.default_model}:generateContent"
         params = {"key": self.config.api_key} if self.config.api_key else {}
-        
+
         text = f"{system}\n\n{prompt}".strip() if system else prompt
-        
+
         # Log the request
-        self._log_request(logger, "google", self.config.default_model, prompt, system, 
+        self._log_request(logger, "google", self.config.default_model, prompt, system,
                          temperature or self.config.temperature)
-        
+
         payload = {
             "contents": [{"role": "user", "parts": [{"text": text}]}],
             "generationConfig": {"temperature": temperature or self.config.temperature}
         }
-        
-        response = requests.post(endpoint, params=params, json=payload, timeout=180)
-        response.raise_for_status()
-        
-        data = response.json()
+
+        return url, params, None, payload
+
+    def _parse_response(self, data: Dict[str, Any], logger=None) -> str:
+        """Parse the generateContent response."""
         try:
             parts = data["candidates"][0]["content"]["parts"]
             combined = "".join(part.get("text", "") for part in parts)
             result = combined.strip()
-            
+
             # Log the response
             self._log_response(logger, "google", result)
-            
+
             return result
         except Exception as e:
             error_msg = f"Failed to parse Google response: {e}"
@@ -381,23 +737,23 @@ class GoogleProvider(BaseLLMProvider):
 
 class LLMProviderFactory:
     """Factory for creating LLM provider instances."""
-    
+
     _providers = {
         "openai": OpenAIProvider,
         "anthropic": AnthropicProvider,
         "ollama": OllamaProvider,
         "google": GoogleProvider,
     }
-    
+
     @classmethod
     def create_provider(cls, provider_type: str, config: ProviderConfig) -> LLMProvider:
         """Create a provider instance based on type."""
         if provider_type not in cls._providers:
             raise ValueError(f"Unknown provider type: {provider_type}")
-        
+
         provider_class = cls._providers[provider_type]
         return provider_class(config)
-    
+
     @classmethod
     def get_available_providers(cls) -> list[str]:
         """Get list of available provider types."""
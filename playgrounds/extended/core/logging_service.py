@@ -27,23 +27,30 @@ class SessionLogger:
         self.logger = logging.getLogger(f'session_{self.session_id}')
         self.logger.setLevel(logging.DEBUG)
         
-        # Create file handler
-        file_handler = logging.FileHandler(self.log_file, mode='a', encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(formatter)
-        
-        # Add handler to logger
-        self.logger.addHandler(file_handler)
+        # Create file handler once per session logger; delay=True defers
+        # opening the file until the first record is emitted
+        if not self.logger.handlers:
+            file_handler = logging.FileHandler(self.log_file, mode='a', encoding='utf-8', delay=True)
+            file_handler.setLevel(logging.DEBUG)
+            
+            # Create formatter
+            formatter = logging.Formatter(
+                '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            file_handler.setFormatter(formatter)
+            
+            # Add handler to logger
+            self.logger.addHandler(file_handler)
         
         # Initialize session
         self.log_session_start()
     
+    @property
+    def debug_enabled(self) -> bool:
+        """Whether debug-level records will actually be emitted."""
+        return self.logger.isEnabledFor(logging.DEBUG)
+    
     def _generate_session_id(self) -> str:
         """Generate a unique session ID."""
         return str(uuid.uuid4())[:8]
@@ -80,12 +87,14 @@ class SessionLogger:
     def log_llm_request(self, provider: str, model: str, prompt: str, system: str = None, 
                        temperature: float = None, max_tokens: int = None):
         """Log LLM request."""
-        self.logger.info(f"[LLM] Request to {provider.upper()}")
-        self.logger.info(f"[LLM] Model: {model}")
-        self.logger.info(f"[LLM] Temperature: {temperature}")
-        self.logger.info(f"[LLM] Max tokens: {max_tokens}")
-        self.logger.info(f"[LLM] System prompt: {system[:200] + '...' if system and len(system) > 200 else system}")
-        self.logger.info(f"[LLM] User prompt: {prompt[:500] + '...' if len(prompt) > 500 else prompt}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("[LLM] Request to %s", provider.upper())
+        self.logger.info("[LLM] Model: %s", model)
+        self.logger.info("[LLM] Temperature: %s", temperature)
+        self.logger.info("[LLM] Max tokens: %s", max_tokens)
+        self.logger.info("[LLM] System prompt: %s", system[:200] + '...' if system and len(system) > 200 else system)
+        self.logger.info("[LLM] User prompt: %s", prompt[:500] + '...' if len(prompt) > 500 else prompt)
     
     def log_llm_response(self, provider: str, response: str, tokens_used: int = None):
         """Log LLM response."""
@@ -445,14 +445,30 @@ class PostgresMCPConnector(BaseMCPConnector):
 
 
 class MCPConnectorFactory:
-    """Factory for creating MCP connector instances."""
-    
-    @staticmethod
-    def create_github_connector(config: MCPGitHubConfig) -> GitHubMCPConnector:
-        """Create a GitHub MCP connector."""
-        return GitHubMCPConnector(config)
-    
-    @staticmethod
-    def create_postgres_connector(config: MCPPostgresConfig) -> PostgresMCPConnector:
-        """Create a PostgreSQL MCP connector."""
-        return PostgresMCPConnector(config)
+    """Factory for creating MCP connector instances.
+
+    Connectors are cached per configuration so repeat requests reuse the
+    same instance instead of rebuilding one per call; fetches open their
+    own fastmcp client session, so a shared instance is safe.
+    """
+
+    _github_cache: Dict[tuple, GitHubMCPConnector] = {}
+    _postgres_cache: Dict[tuple, PostgresMCPConnector] = {}
+
+    @classmethod
+    def create_github_connector(cls, config: MCPGitHubConfig) -> GitHubMCPConnector:
+        """Create (or reuse) a GitHub MCP connector."""
+        key = (config.enabled, config.url, config.auth_token, config.repo)
+        connector = cls._github_cache.get(key)
+        if connector is None:
+            connector = cls._github_cache[key] = GitHubMCPConnector(config)
+        return connector
+
+    @classmethod
+    def create_postgres_connector(cls, config: MCPPostgresConfig) -> PostgresMCPConnector:
+        """Create (or reuse) a PostgreSQL MCP connector."""
+        key = (config.enabled, config.url, config.auth_token, config.sample_sql)
+        connector = cls._postgres_cache.get(key)
+        if connector is None:
+            connector = cls._postgres_cache[key] = PostgresMCPConnector(config)
+        return connector
@@ -2,7 +2,7 @@
 Data models for the LLM Playground application.
 Following SOLID principles with clear separation of concerns.
 """
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from typing import Dict, Any, Optional, List
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -79,10 +79,20 @@ class ProviderConfig:
             self.usage_tracking = UsageTracking()
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['usage_tracking'] = self.usage_tracking.to_dict()
-        return data
+        """Convert to dictionary for serialization.
+
+        The static fields are cached; usage_tracking is merged in fresh
+        because it mutates in place on every tracked call.
+        """
+        base = self.__dict__.get('_static_dict')
+        if base is None:
+            base = {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'usage_tracking'}
+            self.__dict__['_static_dict'] = base
+        return {**base, 'usage_tracking': self.usage_tracking.to_dict()}
+
+    def __setattr__(self, name, value):
+        self.__dict__.pop('_static_dict', None)
+        object.__setattr__(self, name, value)
 
     def is_usage_cap_exceeded(self) -> bool:
         """Check if usage cap is exceeded."""
@@ -158,8 +168,15 @@ class OptimizerConfig:
     max_context_usage: float = 0.8  # Maximum context window usage (80% by default)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        return asdict(self)
+        """Convert to dictionary for serialization (cached until a field changes)."""
+        cached = self.__dict__.get('_cached_dict')
+        if cached is None:
+            cached = self.__dict__['_cached_dict'] = asdict(self)
+        return cached
+
+    def __setattr__(self, name, value):
+        self.__dict__.pop('_cached_dict', None)
+        object.__setattr__(self, name, value)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'OptimizerConfig':
@@ -253,8 +270,11 @@ class ChatMessage:
     timestamp: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
-        return asdict(self)
+        """Convert to dictionary (cached: messages are immutable once appended)."""
+        cached = self.__dict__.get('_cached_dict')
+        if cached is None:
+            cached = self.__dict__['_cached_dict'] = asdict(self)
+        return cached
 
 
 @dataclass
@@ -288,7 +308,7 @@ class OptimizedPromptResult:
 class ChatResponse:
     """Response from chat API."""
     text: str
-    structured: str
+    structured: Dict[str, Any]
     debug: Dict[str, Any]
 
 
@@ -11,31 +11,38 @@ import json
 
 
 class PromptOptimizer:
-    """Main prompt optimizer that coordinates summarization and optimization."""
+    """Main prompt optimizer that coordinates summarization and optimization.
     
-    def __init__(self, config: OptimizerConfig, providers: Dict[str, Any], user_provider: str = None, usage_callback=None):
+    Holds only immutable configuration so one instance can be reused across
+    requests; the per-call user provider and usage callback are passed to
+    build_optimized_prompt instead.
+    """
+    
+    def __init__(self, config: OptimizerConfig, providers: Dict[str, Any]):
         self.config = config
         self.providers = providers
-        self.user_provider = user_provider or config.provider
-        self._optimizer_provider = None
-        self.usage_callback = usage_callback  # Callback to track usage incrementally
+        self._provider_cache: Dict[str, LLMProvider] = {}
+    
+    def _resolve_provider_key(self, user_provider: str = None) -> str:
+        """Use the user's selected provider if configured, else the optimizer default."""
+        return user_provider if user_provider in self.providers else self.config.provider
     
-    def _get_optimizer_provider(self) -> LLMProvider:
+    def _get_optimizer_provider(self, user_provider: str = None) -> LLMProvider:
         """Get the LLM provider for optimization tasks."""
-        if self._optimizer_provider is None:
-            # Use user's selected provider if available, otherwise fall back to optimizer config
-            provider_key = self.user_provider if self.user_provider in self.providers else self.config.provider
+        provider_key = self._resolve_provider_key(user_provider)
+        provider = self._provider_cache.get(provider_key)
+        if provider is None:
             provider_config = self.providers.get(provider_key)
             if not provider_config:
                 raise RuntimeError(f"Provider '{provider_key}' not configured")
             
-            print(f"[OPTIMIZER] Using provider: {provider_key} (user selected: {self.user_provider}, config default: {self.config.provider})")
+            print(f"[OPTIMIZER] Using provider: {provider_key} (user selected: {user_provider}, config default: {self.config.provider})")
             
-            self._optimizer_provider = LLMProviderFactory.create_provider(
+            provider = self._provider_cache[provider_key] = LLMProviderFactory.create_provider(
                 provider_key, provider_config
             )
         
-        return self._optimizer_provider
+        return provider
     
     def estimate_tokens(self, text: str) -> int:
         """Estimate token count for text."""
@@ -47,13 +54,14 @@ class PromptOptimizer:
             return text
         return text[:max(0, max_tokens * 4)]
     
-    def summarize_to_tokens(self, text: str, target_tokens: int, logger=None) -> str:
+    def summarize_to_tokens(self, text: str, target_tokens: int, logger=None,
+                            user_provider: str = None, usage_callback=None) -> str:
         """Summarize text to fit within token budget."""
         if not text:
             return text
         
         try:
-            provider = self._get_optimizer_provider()
+            provider = self._get_optimizer_provider(user_provider)
             system_prompt = "You compress content faithfully. Keep concrete facts, IDs, numbers, names. Prefer bullets."
             prompt = f"""Summarize the following to <= {target_tokens} tokens (approx).
 Keep key facts, titles, dates, URLs, and short comment insights.
@@ -65,10 +73,10 @@ CONTENT:
             output = result.strip()
             
             # Track usage for this summarization call
-            if self.usage_callback:
+            if usage_callback:
                 input_tokens = self.estimate_tokens(prompt)
                 output_tokens = self.estimate_tokens(output)
-                self.usage_callback(input_tokens, output_tokens, 1)
+                usage_callback(input_tokens, output_tokens, 1)
             
             if self.estimate_tokens(output) > target_tokens:
                 return self.trim_to_tokens(output, target_tokens)
@@ -78,10 +86,11 @@ CONTENT:
             return self.trim_to_tokens(text, target_tokens)
     
     def build_optimized_prompt(self, user_prompt: str, issues_text: str, 
-                             papers_text: str, provider_cw_tokens: int, logger=None) -> OptimizedPromptResult:
+                             papers_text: str, provider_cw_tokens: int, logger=None,
+                             user_provider: str = None, usage_callback=None) -> OptimizedPromptResult:
         """Build an optimized prompt with dual context."""
         # Get the actual provider being used
-        actual_provider = self.user_provider if self.user_provider in self.providers else self.config.provider
+        actual_provider = self._resolve_provider_key(user_provider)
         provider_config = self.providers.get(actual_provider)
         
         # Handle both ProviderConfig objects and dictionaries
@@ -134,12 +143,14 @@ CONTENT:
                      else self.trim_to_tokens(user_prompt, user_budget))
         
         # Summarize contexts
-        issues_sum = (self.summarize_to_tokens(issues_text, issues_budget, logger) if issues_text else "")
-        papers_sum = (self.summarize_to_tokens(papers_text, papers_budget, logger) if papers_text else "")
+        issues_sum = (self.summarize_to_tokens(issues_text, issues_budget, logger,
+                                               user_provider, usage_callback) if issues_text else "")
+        papers_sum = (self.summarize_to_tokens(papers_text, papers_budget, logger,
+                                               user_provider, usage_callback) if papers_text else "")
         
         # Optimize instruction
         try:
-            provider = self._get_optimizer_provider()
+            provider = self._get_optimizer_provider(user_provider)
             system_prompt = "You are a specialized prompt optimizer for AI research paper analysis workflows."
             prompt = f"""Rewrite the user request into a crisp, actionable instruction optimized for research paper analysis and GitHub issue integration.
 
@@ -171,13 +182,14 @@ Context B (Research Papers, summarized):
             ).strip() or user_final
             
             # Track usage for this optimization call
-            if self.usage_callback:
+            if usage_callback:
                 input_tokens = self.estimate_tokens(prompt)
                 output_tokens = self.estimate_tokens(optimized_instruction)
-                self.usage_callback(input_tokens, output_tokens, 1)
+                usage_callback(input_tokens, output_tokens, 1)
             
             if self.estimate_tokens(optimized_instruction) > instruction_budget:
-                optimized_instruction = self.summarize_to_tokens(optimized_instruction, instruction_budget, logger)
+                optimized_instruction = self.summarize_to_tokens(optimized_instruction, instruction_budget, logger,
+                                                                 user_provider, usage_callback)
         except Exception as e:
             debug["optimizer_error"] = str(e)
             optimized_instruction = f"""Analyze the user request by combining GitHub issues/comments with research paper insights to provide comprehensive recommendations.
@@ -205,8 +217,10 @@ User request:
             reduce_p = overflow - reduce_i
             new_i_budget = max(100, cur_i - reduce_i)
             new_p_budget = max(100, cur_p - reduce_p)
-            issues_sum = self.summarize_to_tokens(issues_sum, new_i_budget, logger)
-            papers_sum = self.summarize_to_tokens(papers_sum, new_p_budget, logger)
+            issues_sum = self.summarize_to_tokens(issues_sum, new_i_budget, logger,
+                                                  user_provider, usage_callback)
+            papers_sum = self.summarize_to_tokens(papers_sum, new_p_budget, logger,
+                                                  user_provider, usage_callback)
         
         # Build final prompt
         final_prompt = f"""{optimized_instruction}
@@ -221,8 +235,10 @@ User request:
         if self.estimate_tokens(final_prompt) > prompt_budget:
             rem = prompt_budget - self.estimate_tokens(optimized_instruction)
             half = max(80, rem // 2)
-            issues_sum = self.summarize_to_tokens(issues_sum, half, logger)
-            papers_sum = self.summarize_to_tokens(papers_sum, rem - half, logger)
+            issues_sum = self.summarize_to_tokens(issues_sum, half, logger,
+                                                  user_provider, usage_callback)
+            papers_sum = self.summarize_to_tokens(papers_sum, rem - half, logger,
+                                                  user_provider, usage_callback)
             final_prompt = f"""{optimized_instruction}
 
 **GitHub Issues Context** (Project Requirements & Specifications):
@@ -150,6 +150,7 @@ class SettingsManager:
     def __init__(self, repository: SettingsRepository):
         self.repository = repository
         self._cache: Optional[AppSettings] = None
+        self._token_settings_cache: Optional[bytes] = None
     
     def get_settings(self) -> AppSettings:
         """Get current settings, using cache if available."""
@@ -161,6 +162,7 @@ class SettingsManager:
         """Save settings and update cache."""
         self.repository.save(settings)
         self._cache = settings
+        self._token_settings_cache = None
     
     def update_settings(self, updates: Dict[str, Any]) -> AppSettings:
         """Update settings with partial data."""
@@ -198,6 +200,25 @@ class SettingsManager:
     def clear_cache(self) -> None:
         """Clear the settings cache."""
         self._cache = None
+        self._token_settings_cache = None
+    
+    def get_token_settings_json(self) -> bytes:
+        """Serialized token-calculator settings, cached until settings change."""
+        if self._token_settings_cache is None:
+            settings = self.get_settings()
+            token_settings = {"providers": {}, "default_provider": None}
+            for provider_key, provider_config in settings.providers.items():
+                if provider_config.enabled:
+                    token_settings["providers"][provider_key] = {
+                        "name": provider_config.name,
+                        "default_model": provider_config.default_model,
+                        "enabled": provider_config.enabled,
+                    }
+                    # First enabled provider doubles as the default
+                    if token_settings["default_provider"] is None:
+                        token_settings["default_provider"] = provider_key
+            self._token_settings_cache = json.dumps(token_settings).encode("utf-8")
+        return self._token_settings_cache
     
     def update_provider_usage(self, provider_key: str, user_tokens: int = 0, optimized_tokens: int = 0, 
                             response_tokens: int = 0, api_calls: int = 1) -> bool:
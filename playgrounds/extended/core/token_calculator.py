@@ -5,11 +5,16 @@ Implements token counting methods for each provider as per their official APIs.
 
 import tiktoken
 import anthropic
+import functools
 from typing import Dict, List, Optional, Union, Any
 from dataclasses import dataclass
 import json
 import re
 
+# Texts longer than this skip the token-count cache so cached keys stay
+# bounded in memory.
+_COUNT_CACHE_MAX_CHARS = 16384
+
 
 @dataclass
 class TokenCount:
@@ -82,9 +87,20 @@ class TokenCalculator:
             }
         }
         
-        # Initialize OpenAI encodings cache
+        # Initialize OpenAI encodings cache and warm the known models so
+        # the first request doesn't pay the BPE load cost
         self._openai_encodings_cache = {}
+        for model, encoding_name in self.openai_encodings.items():
+            try:
+                self._openai_encodings_cache[model] = tiktoken.get_encoding(encoding_name)
+            except Exception:
+                break  # encoding data unavailable; fall back to lazy loading
         
+    @staticmethod
+    def _basic_metrics(text: str) -> tuple:
+        """Compute (characters, words) once so callers can share them."""
+        return len(text), len(text.split())
+    
     def _get_openai_encoding(self, model: str) -> tiktoken.Encoding:
         """Get the appropriate tiktoken encoding for an OpenAI model."""
         if model in self._openai_encodings_cache:
@@ -101,7 +117,8 @@ class TokenCalculator:
             self._openai_encodings_cache[model] = encoding
             return encoding
     
-    def count_openai_tokens(self, text: str, model: str = "gpt-4") -> TokenCount:
+    def count_openai_tokens(self, text: str, model: str = "gpt-4",
+                            characters: int = None, words: int = None) -> TokenCount:
         """
         Count tokens for OpenAI models using tiktoken.
         
@@ -116,9 +133,9 @@ class TokenCalculator:
             encoding = self._get_openai_encoding(model)
             tokens = encoding.encode(text)
             
-            # Calculate additional metrics
-            characters = len(text)
-            words = len(text.split())
+            # Calculate additional metrics unless precomputed by the caller
+            if characters is None or words is None:
+                characters, words = self._basic_metrics(text)
             
             # Estimate cost
             pricing = self.pricing.get('openai', {}).get(model)
@@ -137,7 +154,8 @@ class TokenCalculator:
         except Exception as e:
             raise ValueError(f"Error counting OpenAI tokens: {e}")
     
-    def count_anthropic_tokens(self, text: str, model: str = "claude-3-5-sonnet") -> TokenCount:
+    def count_anthropic_tokens(self, text: str, model: str = "claude-3-5-sonnet",
+                               characters: int = None, words: int = None) -> TokenCount:
         """
         Count tokens for Anthropic models using their API.
         
@@ -160,9 +178,9 @@ class TokenCalculator:
                 messages=messages
             )
             
-            # Calculate additional metrics
-            characters = len(text)
-            words = len(text.split())
+            # Calculate additional metrics unless precomputed by the caller
+            if characters is None or words is None:
+                characters, words = self._basic_metrics(text)
             
             # Estimate cost
             pricing = self.pricing.get('anthropic', {}).get(model)
@@ -180,15 +198,16 @@ class TokenCalculator:
             )
         except Exception as e:
             # Fallback to estimation if API is not available
-            return self._estimate_anthropic_tokens(text, model)
+            return self._estimate_anthropic_tokens(text, model, characters, words)
     
-    def _estimate_anthropic_tokens(self, text: str, model: str) -> TokenCount:
+    def _estimate_anthropic_tokens(self, text: str, model: str,
+                                   characters: int = None, words: int = None) -> TokenCount:
         """
         Estimate Anthropic tokens when API is not available.
         Uses the general rule: 1 token ≈ 4 characters
         """
-        characters = len(text)
-        words = len(text.split())
+        if characters is None or words is None:
+            characters, words = self._basic_metrics(text)
         
         # Anthropic token estimation
         estimated_tokens = characters // 4
@@ -208,7 +227,8 @@ class TokenCalculator:
             provider='anthropic'
         )
     
-    def count_gemini_tokens(self, text: str, model: str = "gemini-2.0-flash") -> TokenCount:
+    def count_gemini_tokens(self, text: str, model: str = "gemini-2.0-flash",
+                            characters: int = None, words: int = None) -> TokenCount:
         """
         Count tokens for Google Gemini models.
         Note: This is an estimation as the actual API requires authentication.
@@ -222,8 +242,8 @@ class TokenCalculator:
         """
         try:
             # For now, we'll use estimation since the actual API requires setup
-            characters = len(text)
-            words = len(text.split())
+            if characters is None or words is None:
+                characters, words = self._basic_metrics(text)
             
             # Gemini token estimation (1 token ≈ 4 characters)
             estimated_tokens = characters // 4
@@ -245,7 +265,8 @@ class TokenCalculator:
         except Exception as e:
             raise ValueError(f"Error counting Gemini tokens: {e}")
     
-    def count_tokens(self, text: str, provider: str = "openai", model: str = None) -> TokenCount:
+    def count_tokens(self, text: str, provider: str = "openai", model: str = None,
+                     characters: int = None, words: int = None) -> TokenCount:
         """
         Count tokens for any supported provider.
         
@@ -268,15 +289,48 @@ class TokenCalculator:
                 'google': 'gemini-2.0-flash'
             }.get(provider, 'gpt-4')
         
+        # Identical short inputs (system prompts, re-sent user prompts) are
+        # counted once and served from the LRU cache afterwards
+        if characters is None and words is None and len(text) <= _COUNT_CACHE_MAX_CHARS:
+            return self._count_tokens_cached(text, provider, model)
+        
+        return self._count_tokens_uncached(text, provider, model, characters, words)
+    
+    @functools.lru_cache(maxsize=4096)
+    def _count_tokens_cached(self, text: str, provider: str, model: str) -> TokenCount:
+        """LRU-cached variant of the provider dispatch below."""
+        return self._count_tokens_uncached(text, provider, model)
+    
+    def _count_tokens_uncached(self, text: str, provider: str, model: str,
+                               characters: int = None, words: int = None) -> TokenCount:
+        """Dispatch token counting to the provider-specific implementation."""
         if provider == 'openai':
-            return self.count_openai_tokens(text, model)
+            return self.count_openai_tokens(text, model, characters, words)
         elif provider == 'anthropic':
-            return self.count_anthropic_tokens(text, model)
+            return self.count_anthropic_tokens(text, model, characters, words)
         elif provider == 'google':
-            return self.count_gemini_tokens(text, model)
+            return self.count_gemini_tokens(text, model, characters, words)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
     
+    def count_tokens_bulk(self, texts: List[str], provider: str = "openai",
+                          model: str = None) -> List[int]:
+        """
+        Count input tokens for many texts in one pass.
+        
+        For OpenAI this uses tiktoken's encode_batch, which tokenizes the
+        whole batch on an internal thread pool; other providers fall back
+        to per-text counting.
+        """
+        if not texts:
+            return []
+        
+        if provider == 'openai':
+            encoding = self._get_openai_encoding(model or 'gpt-4')
+            return [len(tokens) for tokens in encoding.encode_batch(list(texts))]
+        
+        return [self.count_tokens(text, provider, model).input_tokens for text in texts]
+    
     def estimate_cost(self, input_tokens: int, output_tokens: int, provider: str, model: str) -> float:
         """
         Estimate the cost for a complete request.
@@ -303,6 +357,7 @@ class TokenCalculator:
         """Get list of available models for a provider."""
         return list(self.pricing.get(provider, {}).keys())
     
+    @functools.lru_cache(maxsize=256)
     def get_model_info(self, provider: str, model: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific model."""
         pricing = self.pricing.get(provider, {}).get(model)
@@ -347,11 +402,12 @@ class TokenCalculator:
         words = len(text.split())
         sentences = len(re.split(r'[.!?]+', text))
         
-        # Token counts for each specified provider
+        # Token counts for each specified provider, sharing the basic
+        # metrics computed above instead of re-deriving them per provider
         provider_results = {}
         for provider in providers:
             try:
-                token_count = self.count_tokens(text, provider)
+                token_count = self.count_tokens(text, provider, characters=characters, words=words)
                 provider_results[provider] = {
                     'input_tokens': token_count.input_tokens,
                     'estimated_cost': token_count.estimated_cost,
@@ -847,14 +847,19 @@ class ChatManager {
             const data = await response.json();
             this.app.logDebug('send.response', { status: response.status, data: data });
 
-                         this.addToConversation(userPrompt, data.structured || data.text || "(no response)");
+             // structured is a parsed object (older builds returned a JSON string)
+             const structuredText = typeof data.structured === 'string'
+                 ? data.structured
+                 : (data.structured ? JSON.stringify(data.structured, null, 2) : null);
+
+                         this.addToConversation(userPrompt, structuredText || data.text || "(no response)");
              
              // Final usage update after send operation
              this.updateProviderUsageDisplay(provider, 0, 0);
 
             this.app.logDebug('send.conversation', { 
                 userMessage: userPrompt, 
-                botResponse: data.structured || data.text || "(no response)",
+                botResponse: structuredText || data.text || "(no response)",
                 conversationLength: document.getElementById('conversation')?.children?.length || 0
             });
 